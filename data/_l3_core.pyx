@@ -0,0 +1,228 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True
+"""Cython build of the L3 generator planning kernels.
+
+Fallback backend for generate_l3_data.py when Numba is not installed.
+Build in place with:
+
+    python setup_l3_core.py build_ext --inplace
+
+The kernels mirror the @njit functions in generate_l3_data.py and must
+produce identical event streams for the same pre-drawn decision arrays.
+"""
+
+import numpy as np
+
+ctypedef long long i64
+
+cdef int KIND_ADD = 0
+cdef int KIND_CANCEL = 1
+cdef int KIND_TRADE = 2
+
+cdef i64 TICKS_PER_HALF = 50
+cdef i64 PRICE_MIN_TICKS = 4_100_000
+cdef i64 PRICE_MAX_TICKS = 4_300_000
+
+
+def plan_phase2(double[::1] r, unsigned char[::1] side_draws, double[::1] band,
+                i64[::1] buy_improve, i64[::1] buy_normal,
+                i64[::1] sell_improve, i64[::1] sell_normal,
+                i64[::1] trade_prices, int[::1] add_qtys, int[::1] trade_qtys,
+                double[::1] cancel_picks, i64 first_oid,
+                i64[::1] active_ids, i64[::1] active_prices,
+                int[::1] active_qtys, Py_ssize_t n_active):
+    """Plan the phase-2 event stream; see _plan_phase2 in generate_l3_data.py."""
+    cdef Py_ssize_t target = r.shape[0]
+    kinds_arr = np.empty(target, np.uint8)
+    sides_arr = np.empty(target, np.uint8)
+    prices_arr = np.empty(target, np.int64)
+    qtys_arr = np.empty(target, np.int32)
+    oids_arr = np.empty(target, np.int64)
+    cdef unsigned char[::1] kinds = kinds_arr
+    cdef unsigned char[::1] sides = sides_arr
+    cdef i64[::1] prices = prices_arr
+    cdef int[::1] qtys = qtys_arr
+    cdef i64[::1] oids = oids_arr
+    cdef i64 next_oid = first_oid
+    cdef i64 price
+    cdef Py_ssize_t n = 0, i, j, last
+    for i in range(target):
+        if r[i] < 0.60:
+            if side_draws[i] == 0:
+                price = buy_improve[i] if band[i] < 0.15 else buy_normal[i]
+            else:
+                price = sell_improve[i] if band[i] < 0.15 else sell_normal[i]
+            kinds[n] = KIND_ADD
+            sides[n] = side_draws[i]
+            prices[n] = price
+            qtys[n] = add_qtys[i]
+            oids[n] = next_oid
+            active_ids[n_active] = next_oid
+            active_prices[n_active] = price
+            active_qtys[n_active] = add_qtys[i]
+            n_active += 1
+            next_oid += 1
+            n += 1
+        elif r[i] < 0.90:
+            if n_active == 0:
+                continue
+            j = <Py_ssize_t>(cancel_picks[i] * n_active)
+            kinds[n] = KIND_CANCEL
+            sides[n] = 0
+            prices[n] = active_prices[j]
+            qtys[n] = active_qtys[j]
+            oids[n] = active_ids[j]
+            last = n_active - 1
+            active_ids[j] = active_ids[last]
+            active_prices[j] = active_prices[last]
+            active_qtys[j] = active_qtys[last]
+            n_active -= 1
+            n += 1
+        else:
+            kinds[n] = KIND_TRADE
+            sides[n] = side_draws[i]
+            prices[n] = trade_prices[i]
+            qtys[n] = trade_qtys[i]
+            oids[n] = 0
+            n += 1
+    return kinds_arr, sides_arr, prices_arr, qtys_arr, oids_arr, n, next_oid, n_active
+
+
+def plan_phase3(double[::1] r, double[::1] side_draws, double[::1] band,
+                double[::1] buy_agg_off, double[::1] buy_pass_off,
+                double[::1] sell_agg_off, double[::1] sell_pass_off,
+                double[::1] trade_off, int[::1] add_qtys, int[::1] trade_qtys,
+                double[::1] cancel_picks, i64 first_oid,
+                i64[::1] active_ids, i64[::1] active_prices,
+                int[::1] active_qtys, Py_ssize_t n_active):
+    """Plan the phase-3 event stream; see _plan_phase3 in generate_l3_data.py."""
+    cdef Py_ssize_t target = r.shape[0]
+    kinds_arr = np.empty(target, np.uint8)
+    sides_arr = np.empty(target, np.uint8)
+    prices_arr = np.empty(target, np.int64)
+    qtys_arr = np.empty(target, np.int32)
+    oids_arr = np.empty(target, np.int64)
+    cdef unsigned char[::1] kinds = kinds_arr
+    cdef unsigned char[::1] sides = sides_arr
+    cdef i64[::1] prices = prices_arr
+    cdef int[::1] qtys = qtys_arr
+    cdef i64[::1] oids = oids_arr
+    cdef double mid_start = 42000.0
+    cdef double mid_end = 42100.0
+    cdef double mid, off
+    cdef i64 next_oid = first_oid
+    cdef i64 price
+    cdef int s
+    cdef Py_ssize_t n = 0, i, j, last
+    for i in range(target):
+        mid = mid_start + (mid_end - mid_start) * (<double>i / target)
+        if r[i] < 0.55:
+            s = 0 if side_draws[i] < 0.55 else 1
+            if s == 0:
+                off = buy_agg_off[i] if band[i] < 0.35 else buy_pass_off[i]
+            else:
+                off = sell_agg_off[i] if band[i] < 0.25 else sell_pass_off[i]
+            # round() keeps CPython's round-half-even so all backends agree.
+            price = <i64>round((mid + off) * 2.0) * TICKS_PER_HALF
+            price = max(PRICE_MIN_TICKS, min(PRICE_MAX_TICKS, price))
+            kinds[n] = KIND_ADD
+            sides[n] = s
+            prices[n] = price
+            qtys[n] = add_qtys[i]
+            oids[n] = next_oid
+            active_ids[n_active] = next_oid
+            active_prices[n_active] = price
+            active_qtys[n_active] = add_qtys[i]
+            n_active += 1
+            next_oid += 1
+            n += 1
+        elif r[i] < 0.80:
+            if n_active == 0:
+                continue
+            j = <Py_ssize_t>(cancel_picks[i] * n_active)
+            kinds[n] = KIND_CANCEL
+            sides[n] = 0
+            prices[n] = active_prices[j]
+            qtys[n] = active_qtys[j]
+            oids[n] = active_ids[j]
+            last = n_active - 1
+            active_ids[j] = active_ids[last]
+            active_prices[j] = active_prices[last]
+            active_qtys[j] = active_qtys[last]
+            n_active -= 1
+            n += 1
+        else:
+            price = <i64>round((mid + trade_off[i]) * 2.0) * TICKS_PER_HALF
+            price = max(PRICE_MIN_TICKS, min(PRICE_MAX_TICKS, price))
+            kinds[n] = KIND_TRADE
+            sides[n] = 0 if side_draws[i] < 0.55 else 1
+            prices[n] = price
+            qtys[n] = trade_qtys[i]
+            oids[n] = 0
+            n += 1
+    return kinds_arr, sides_arr, prices_arr, qtys_arr, oids_arr, n, next_oid, n_active
+
+
+def plan_phase4(double[::1] r, unsigned char[::1] side_draws, double[::1] flip,
+                i64[::1] buy_prices, i64[::1] buy_flip_prices,
+                i64[::1] sell_prices, i64[::1] sell_flip_prices,
+                i64[::1] trade_prices, int[::1] add_qtys, int[::1] trade_qtys,
+                double[::1] cancel_picks, i64 first_oid,
+                i64[::1] active_ids, i64[::1] active_prices,
+                int[::1] active_qtys, Py_ssize_t n_active):
+    """Plan the phase-4 event stream; see _plan_phase4 in generate_l3_data.py."""
+    cdef Py_ssize_t target = r.shape[0]
+    kinds_arr = np.empty(target, np.uint8)
+    sides_arr = np.empty(target, np.uint8)
+    prices_arr = np.empty(target, np.int64)
+    qtys_arr = np.empty(target, np.int32)
+    oids_arr = np.empty(target, np.int64)
+    cdef unsigned char[::1] kinds = kinds_arr
+    cdef unsigned char[::1] sides = sides_arr
+    cdef i64[::1] prices = prices_arr
+    cdef int[::1] qtys = qtys_arr
+    cdef i64[::1] oids = oids_arr
+    cdef i64 next_oid = first_oid
+    cdef i64 price
+    cdef Py_ssize_t n = 0, i, j, last
+    for i in range(target):
+        if r[i] < 0.65:
+            if side_draws[i] == 0:
+                price = buy_flip_prices[i] if flip[i] < 0.08 else buy_prices[i]
+            else:
+                price = sell_flip_prices[i] if flip[i] < 0.08 else sell_prices[i]
+            price = max(PRICE_MIN_TICKS, min(PRICE_MAX_TICKS, price))
+            kinds[n] = KIND_ADD
+            sides[n] = side_draws[i]
+            prices[n] = price
+            qtys[n] = add_qtys[i]
+            oids[n] = next_oid
+            active_ids[n_active] = next_oid
+            active_prices[n_active] = price
+            active_qtys[n_active] = add_qtys[i]
+            n_active += 1
+            next_oid += 1
+            n += 1
+        elif r[i] < 0.90:
+            if n_active == 0:
+                continue
+            j = <Py_ssize_t>(cancel_picks[i] * n_active)
+            kinds[n] = KIND_CANCEL
+            sides[n] = 0
+            prices[n] = active_prices[j]
+            qtys[n] = active_qtys[j]
+            oids[n] = active_ids[j]
+            last = n_active - 1
+            active_ids[j] = active_ids[last]
+            active_prices[j] = active_prices[last]
+            active_qtys[j] = active_qtys[last]
+            n_active -= 1
+            n += 1
+        else:
+            price = max(PRICE_MIN_TICKS, min(PRICE_MAX_TICKS, trade_prices[i]))
+            kinds[n] = KIND_TRADE
+            sides[n] = side_draws[i]
+            prices[n] = price
+            qtys[n] = trade_qtys[i]
+            oids[n] = 0
+            n += 1
+    return kinds_arr, sides_arr, prices_arr, qtys_arr, oids_arr, n, next_oid, n_active
@@ -1,20 +1,109 @@
 #!/usr/bin/env python3
-import random
 import csv
 import os
+import sys
+from array import array
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op decorator: run the kernels interpreted when Numba is absent."""
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrap(func):
+            return func
+        return wrap
 
 OUTPUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "btcusdt_l3_sample.csv")
 START_TS = 1704067200000000000
 TS_INCREMENT = 100_000
 SEED = 42
-random.seed(SEED)
+
+# Counter-based Squares RNG (Widynski, arXiv:2004.06278). Each value is a
+# pure function of (counter, key), so any index of a stream can be computed
+# independently: phases own disjoint counter ranges, and a parallel backend
+# can fill array slices deterministically regardless of worker count --
+# unlike stateful generators such as np.random.default_rng.
+SQUARES_KEY = np.uint64(0x548C9DECBCE65297)
+PHASE_STRIDE = 1 << 24  # counter range reserved per phase stream
+
+_counter = 0
+
+def _squares64(ctrs):
+    """Vectorized squares64 hash: uint64 counters -> uint64 randoms."""
+    sh = np.uint64(32)
+    x = ctrs * SQUARES_KEY
+    y = x.copy()
+    z = y + SQUARES_KEY
+    x = x * x + y
+    x = (x >> sh) | (x << sh)
+    x = x * x + z
+    x = (x >> sh) | (x << sh)
+    x = x * x + y
+    x = (x >> sh) | (x << sh)
+    t = x * x + z
+    x = (t >> sh) | (t << sh)
+    return t ^ ((x * x + y) >> sh)
+
+def _use_stream(phase):
+    """Point the counter at the start of a phase's disjoint range."""
+    global _counter
+    _counter = (SEED * 16 + phase) * PHASE_STRIDE
+
+def _reserve(n):
+    """Claim the next n counters of the current stream."""
+    global _counter
+    ctrs = np.arange(_counter, _counter + n, dtype=np.uint64)
+    _counter += n
+    return ctrs
+
+def _uniforms(n):
+    """n uniforms in [0, 1) with 53-bit resolution."""
+    bits = _squares64(_reserve(n)) >> np.uint64(11)
+    return bits.astype(np.float64) * (1.0 / (1 << 53))
+
+def _uniform_between(lo, hi, n):
+    """n uniforms in [lo, hi)."""
+    return lo + (hi - lo) * _uniforms(n)
+
+def _integers(lo, hi, n, dtype):
+    """n ints in [lo, hi). Modulo bias is ~span/2^64 -- irrelevant here."""
+    span = np.uint64(hi - lo)
+    return (lo + (_squares64(_reserve(n)) % span)).astype(dtype)
+
+# Event kinds emitted by the planning kernels.
+KIND_ADD = 0
+KIND_CANCEL = 1
+KIND_TRADE = 2
+
+# Prices are planned in integer ticks (1 tick = $0.01) so the kernels
+# stay in pure integer/float arithmetic; formatting happens on replay.
+TICKS_PER_HALF = 50
+PRICE_MIN_TICKS = 4_100_000
+PRICE_MAX_TICKS = 4_300_000
 
 next_order_id = 1
 current_ts = START_TS
 rows = []
-active_orders = {}
-buy_orders = set()
-sell_orders = set()
+# Active-order store, struct-of-arrays: parallel columns indexed by a
+# compact slot plus an oid -> slot map. ~17 bytes per live order instead
+# of a ~200-byte dict payload each; removal is a swap with the tail.
+active_oids = array("q")
+active_prices = array("q")
+active_qtys = array("i")
+active_sides = bytearray()  # 0 = BUY, 1 = SELL
+oid_to_slot = {}
+# Per-side live-order counts; only sizes are ever needed, so plain
+# counters replace the old buy/sell id sets (two hash ops per event).
+n_buy = 0
+n_sell = 0
 
 def alloc_order_id():
     global next_order_id
@@ -28,214 +117,454 @@ def tick():
     current_ts += TS_INCREMENT
     return ts
 
-def fmt_price(p):
-    return "{:.2f}".format(p)
+def fmt_price(t):
+    # Prices are integer ticks (1 tick = $0.01) everywhere; splitting
+    # with divmod-style arithmetic skips float formatting entirely.
+    return f"{t // 100}.{t % 100:02d}"
 
 def add_order(side, price, quantity):
+    global n_buy, n_sell
     oid = alloc_order_id()
     ts = tick()
     rows.append((ts, "ADD", oid, side, fmt_price(price), quantity))
-    active_orders[oid] = {"side": side, "price": price, "quantity": quantity}
+    oid_to_slot[oid] = len(active_oids)
+    active_oids.append(oid)
+    active_prices.append(price)
+    active_qtys.append(quantity)
     if side == "BUY":
-        buy_orders.add(oid)
+        active_sides.append(0)
+        n_buy += 1
     else:
-        sell_orders.add(oid)
+        active_sides.append(1)
+        n_sell += 1
     return oid
 
+def remove_active(oid):
+    """Swap-remove an order from the SoA store; returns (side, price, qty)."""
+    slot = oid_to_slot.pop(oid)
+    side = active_sides[slot]
+    price = active_prices[slot]
+    qty = active_qtys[slot]
+    last = len(active_oids) - 1
+    if slot != last:
+        moved = active_oids[last]
+        active_oids[slot] = moved
+        active_prices[slot] = active_prices[last]
+        active_qtys[slot] = active_qtys[last]
+        active_sides[slot] = active_sides[last]
+        oid_to_slot[moved] = slot
+    active_oids.pop()
+    active_prices.pop()
+    active_qtys.pop()
+    active_sides.pop()
+    return side, price, qty
+
 def cancel_order(oid):
+    global n_buy, n_sell
     ts = tick()
-    rows.append((ts, "CANCEL", oid, "", fmt_price(active_orders[oid]["price"]),
-                 active_orders[oid]["quantity"]))
-    del active_orders[oid]
-    buy_orders.discard(oid)
-    sell_orders.discard(oid)
+    side, price, qty = remove_active(oid)
+    rows.append((ts, "CANCEL", oid, "", fmt_price(price), qty))
+    if side == 0:
+        n_buy -= 1
+    else:
+        n_sell -= 1
 
 def emit_trade(side, price, quantity):
     ts = tick()
     rows.append((ts, "TRADE", "", side, fmt_price(price), quantity))
 
+def half_ticks(values):
+    """Round an array of float prices to the nearest half and convert to ticks."""
+    return (np.round(np.asarray(values) * 2) * TICKS_PER_HALF).astype(np.int64)
+
+@njit(cache=True)
+def _plan_phase2(r, side_draws, band, buy_improve, buy_normal, sell_improve,
+                 sell_normal, trade_prices, add_qtys, trade_qtys, cancel_picks,
+                 first_oid, active_ids, active_prices, active_qtys, n_active):
+    """Plan the phase-2 event stream without touching Python objects.
+
+    Consumes pre-drawn decision arrays and returns the planned events as
+    parallel column arrays (kind, side, price ticks, qty, oid) plus the
+    advanced order-id and active-order state.
+    """
+    target = r.shape[0]
+    kinds = np.empty(target, np.uint8)
+    sides = np.empty(target, np.uint8)
+    prices = np.empty(target, np.int64)
+    qtys = np.empty(target, np.int32)
+    oids = np.empty(target, np.int64)
+    next_oid = first_oid
+    n = 0
+    for i in range(target):
+        if r[i] < 0.60:
+            if side_draws[i] == 0:
+                price = buy_improve[i] if band[i] < 0.15 else buy_normal[i]
+            else:
+                price = sell_improve[i] if band[i] < 0.15 else sell_normal[i]
+            kinds[n] = KIND_ADD
+            sides[n] = side_draws[i]
+            prices[n] = price
+            qtys[n] = add_qtys[i]
+            oids[n] = next_oid
+            active_ids[n_active] = next_oid
+            active_prices[n_active] = price
+            active_qtys[n_active] = add_qtys[i]
+            n_active += 1
+            next_oid += 1
+            n += 1
+        elif r[i] < 0.90:
+            if n_active == 0:
+                continue
+            j = int(cancel_picks[i] * n_active)
+            kinds[n] = KIND_CANCEL
+            sides[n] = 0
+            prices[n] = active_prices[j]
+            qtys[n] = active_qtys[j]
+            oids[n] = active_ids[j]
+            # Swap-remove: O(1) per cancel instead of shifting the tail.
+            last = n_active - 1
+            active_ids[j] = active_ids[last]
+            active_prices[j] = active_prices[last]
+            active_qtys[j] = active_qtys[last]
+            n_active -= 1
+            n += 1
+        else:
+            kinds[n] = KIND_TRADE
+            sides[n] = side_draws[i]
+            prices[n] = trade_prices[i]
+            qtys[n] = trade_qtys[i]
+            oids[n] = 0
+            n += 1
+    return kinds, sides, prices, qtys, oids, n, next_oid, n_active
+
+@njit(cache=True)
+def _plan_phase3(r, side_draws, band, buy_agg_off, buy_pass_off, sell_agg_off,
+                 sell_pass_off, trade_off, add_qtys, trade_qtys, cancel_picks,
+                 first_oid, active_ids, active_prices, active_qtys, n_active):
+    """Plan the phase-3 (trending mid) event stream; see _plan_phase2."""
+    target = r.shape[0]
+    kinds = np.empty(target, np.uint8)
+    sides = np.empty(target, np.uint8)
+    prices = np.empty(target, np.int64)
+    qtys = np.empty(target, np.int32)
+    oids = np.empty(target, np.int64)
+    mid_start = 42000.0
+    mid_end = 42100.0
+    next_oid = first_oid
+    n = 0
+    for i in range(target):
+        mid = mid_start + (mid_end - mid_start) * (i / target)
+        if r[i] < 0.55:
+            s = 0 if side_draws[i] < 0.55 else 1
+            if s == 0:
+                off = buy_agg_off[i] if band[i] < 0.35 else buy_pass_off[i]
+            else:
+                off = sell_agg_off[i] if band[i] < 0.25 else sell_pass_off[i]
+            price = int(round((mid + off) * 2.0)) * TICKS_PER_HALF
+            price = max(PRICE_MIN_TICKS, min(PRICE_MAX_TICKS, price))
+            kinds[n] = KIND_ADD
+            sides[n] = s
+            prices[n] = price
+            qtys[n] = add_qtys[i]
+            oids[n] = next_oid
+            active_ids[n_active] = next_oid
+            active_prices[n_active] = price
+            active_qtys[n_active] = add_qtys[i]
+            n_active += 1
+            next_oid += 1
+            n += 1
+        elif r[i] < 0.80:
+            if n_active == 0:
+                continue
+            j = int(cancel_picks[i] * n_active)
+            kinds[n] = KIND_CANCEL
+            sides[n] = 0
+            prices[n] = active_prices[j]
+            qtys[n] = active_qtys[j]
+            oids[n] = active_ids[j]
+            # Swap-remove: O(1) per cancel instead of shifting the tail.
+            last = n_active - 1
+            active_ids[j] = active_ids[last]
+            active_prices[j] = active_prices[last]
+            active_qtys[j] = active_qtys[last]
+            n_active -= 1
+            n += 1
+        else:
+            price = int(round((mid + trade_off[i]) * 2.0)) * TICKS_PER_HALF
+            price = max(PRICE_MIN_TICKS, min(PRICE_MAX_TICKS, price))
+            kinds[n] = KIND_TRADE
+            sides[n] = 0 if side_draws[i] < 0.55 else 1
+            prices[n] = price
+            qtys[n] = trade_qtys[i]
+            oids[n] = 0
+            n += 1
+    return kinds, sides, prices, qtys, oids, n, next_oid, n_active
+
+@njit(cache=True)
+def _plan_phase4(r, side_draws, flip, buy_prices, buy_flip_prices, sell_prices,
+                 sell_flip_prices, trade_prices, add_qtys, trade_qtys,
+                 cancel_picks, first_oid, active_ids, active_prices,
+                 active_qtys, n_active):
+    """Plan the phase-4 (stable mid) event stream; see _plan_phase2."""
+    target = r.shape[0]
+    kinds = np.empty(target, np.uint8)
+    sides = np.empty(target, np.uint8)
+    prices = np.empty(target, np.int64)
+    qtys = np.empty(target, np.int32)
+    oids = np.empty(target, np.int64)
+    next_oid = first_oid
+    n = 0
+    for i in range(target):
+        if r[i] < 0.65:
+            if side_draws[i] == 0:
+                price = buy_flip_prices[i] if flip[i] < 0.08 else buy_prices[i]
+            else:
+                price = sell_flip_prices[i] if flip[i] < 0.08 else sell_prices[i]
+            price = max(PRICE_MIN_TICKS, min(PRICE_MAX_TICKS, price))
+            kinds[n] = KIND_ADD
+            sides[n] = side_draws[i]
+            prices[n] = price
+            qtys[n] = add_qtys[i]
+            oids[n] = next_oid
+            active_ids[n_active] = next_oid
+            active_prices[n_active] = price
+            active_qtys[n_active] = add_qtys[i]
+            n_active += 1
+            next_oid += 1
+            n += 1
+        elif r[i] < 0.90:
+            if n_active == 0:
+                continue
+            j = int(cancel_picks[i] * n_active)
+            kinds[n] = KIND_CANCEL
+            sides[n] = 0
+            prices[n] = active_prices[j]
+            qtys[n] = active_qtys[j]
+            oids[n] = active_ids[j]
+            # Swap-remove: O(1) per cancel instead of shifting the tail.
+            last = n_active - 1
+            active_ids[j] = active_ids[last]
+            active_prices[j] = active_prices[last]
+            active_qtys[j] = active_qtys[last]
+            n_active -= 1
+            n += 1
+        else:
+            price = max(PRICE_MIN_TICKS, min(PRICE_MAX_TICKS, trade_prices[i]))
+            kinds[n] = KIND_TRADE
+            sides[n] = side_draws[i]
+            prices[n] = price
+            qtys[n] = trade_qtys[i]
+            oids[n] = 0
+            n += 1
+    return kinds, sides, prices, qtys, oids, n, next_oid, n_active
+
+# Kernel backend selection: Numba-jitted kernels when available, then the
+# compiled Cython extension (cd data && python setup_l3_core.py build_ext
+# --inplace), and finally the interpreted kernels above.
+if NUMBA_AVAILABLE:
+    KERNEL_BACKEND = "numba"
+else:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    try:
+        from _l3_core import (plan_phase2 as _plan_phase2,
+                              plan_phase3 as _plan_phase3,
+                              plan_phase4 as _plan_phase4)
+        KERNEL_BACKEND = "cython"
+    except ImportError:
+        KERNEL_BACKEND = "python"
+
+def _kernel_state(extra_capacity):
+    """Snapshot active orders into flat arrays for a planning kernel."""
+    n = len(active_oids)
+    cap = n + extra_capacity
+    ids = np.empty(cap, np.int64)
+    prices = np.empty(cap, np.int64)
+    qtys = np.empty(cap, np.int32)
+    ids[:n] = np.frombuffer(active_oids, dtype=np.int64)
+    prices[:n] = np.frombuffer(active_prices, dtype=np.int64)
+    qtys[:n] = np.frombuffer(active_qtys, dtype=np.int32)
+    return ids, prices, qtys, n
+
+def _apply_plan(kinds, sides, prices, qtys, oids, n, next_oid):
+    """Replay a planned event stream into rows and the active-order book."""
+    global next_order_id, n_buy, n_sell
+    for i in range(n):
+        side = "BUY" if sides[i] == 0 else "SELL"
+        price = int(prices[i])
+        kind = kinds[i]
+        if kind == KIND_ADD:
+            oid = int(oids[i])
+            ts = tick()
+            qty = int(qtys[i])
+            rows.append((ts, "ADD", oid, side, fmt_price(price), qty))
+            oid_to_slot[oid] = len(active_oids)
+            active_oids.append(oid)
+            active_prices.append(price)
+            active_qtys.append(qty)
+            if side == "BUY":
+                active_sides.append(0)
+                n_buy += 1
+            else:
+                active_sides.append(1)
+                n_sell += 1
+        elif kind == KIND_CANCEL:
+            oid = int(oids[i])
+            ts = tick()
+            rows.append((ts, "CANCEL", oid, "", fmt_price(price), int(qtys[i])))
+            if remove_active(oid)[0] == 0:
+                n_buy -= 1
+            else:
+                n_sell -= 1
+        else:
+            ts = tick()
+            rows.append((ts, "TRADE", "", side, fmt_price(price), int(qtys[i])))
+    next_order_id = int(next_oid)
+
 def phase1():
     target = 500
     count = 0
-    buy_levels = [round(41950.0 + i * 0.5, 2) for i in range(101)]
-    for lvl in buy_levels:
-        n = random.randint(2, 5)
+    buy_levels = 4_195_000 + np.arange(101, dtype=np.int64) * TICKS_PER_HALF
+    sell_levels = 4_200_100 + np.arange(99, dtype=np.int64) * TICKS_PER_HALF
+    # Batch-draw every random decision up front; the loops below only
+    # consume precomputed values.
+    _use_stream(1)
+    level_counts = _integers(2, 6, len(buy_levels) + len(sell_levels), np.int32)
+    qtys = _integers(1, 21, target, np.int32)
+    fill_sides = _uniforms(target)
+    fill_buy_idx = _integers(0, len(buy_levels), target, np.int64)
+    fill_sell_idx = _integers(0, len(sell_levels), target, np.int64)
+    for lvl, n in zip(buy_levels, level_counts[: len(buy_levels)]):
         for _ in range(n):
             if count >= target:
                 return
-            qty = random.randint(1, 20)
-            add_order("BUY", lvl, qty)
+            add_order("BUY", int(lvl), int(qtys[count]))
             count += 1
-    sell_levels = [round(42001.0 + i * 0.5, 2) for i in range(99)]
-    for lvl in sell_levels:
-        n = random.randint(2, 5)
+    for lvl, n in zip(sell_levels, level_counts[len(buy_levels):]):
         for _ in range(n):
             if count >= target:
                 return
-            qty = random.randint(1, 20)
-            add_order("SELL", lvl, qty)
+            add_order("SELL", int(lvl), int(qtys[count]))
             count += 1
     while count < target:
-        if random.random() < 0.5:
-            lvl = random.choice(buy_levels)
-            add_order("BUY", lvl, random.randint(1, 20))
+        if fill_sides[count] < 0.5:
+            add_order("BUY", int(buy_levels[fill_buy_idx[count]]), int(qtys[count]))
         else:
-            lvl = random.choice(sell_levels)
-            add_order("SELL", lvl, random.randint(1, 20))
+            add_order("SELL", int(sell_levels[fill_sell_idx[count]]), int(qtys[count]))
         count += 1
 
 def phase2():
     target = 2000
-    count = 0
     price_min = 41950.0
     price_max = 42050.0
-    while count < target:
-        r = random.random()
-        if r < 0.60:
-            side = "BUY" if random.random() < 0.5 else "SELL"
-            if side == "BUY":
-                if random.random() < 0.15:
-                    price = round(random.uniform(42001.0, 42010.0) * 2) / 2
-                else:
-                    price = round(random.uniform(price_min, 42000.0) * 2) / 2
-            else:
-                if random.random() < 0.15:
-                    price = round(random.uniform(41990.0, 42000.0) * 2) / 2
-                else:
-                    price = round(random.uniform(42001.0, price_max) * 2) / 2
-            qty = random.randint(1, 20)
-            add_order(side, price, qty)
-            count += 1
-        elif r < 0.90:
-            if not active_orders:
-                continue
-            oid = random.choice(list(active_orders.keys()))
-            cancel_order(oid)
-            count += 1
-        else:
-            side = "BUY" if random.random() < 0.5 else "SELL"
-            price = round(random.uniform(42000.0, 42001.0) * 2) / 2
-            qty = random.randint(1, 10)
-            emit_trade(side, price, qty)
-            count += 1
+    _use_stream(2)
+    r = _uniforms(target)
+    sides = _integers(0, 2, target, np.uint8)
+    band = _uniforms(target)
+    buy_improve = half_ticks(_uniform_between(42001.0, 42010.0, target))
+    buy_normal = half_ticks(_uniform_between(price_min, 42000.0, target))
+    sell_improve = half_ticks(_uniform_between(41990.0, 42000.0, target))
+    sell_normal = half_ticks(_uniform_between(42001.0, price_max, target))
+    trade_prices = half_ticks(_uniform_between(42000.0, 42001.0, target))
+    add_qtys = _integers(1, 21, target, np.int32)
+    trade_qtys = _integers(1, 11, target, np.int32)
+    cancel_picks = _uniforms(target)
+    ids, prices, qtys, n_active = _kernel_state(target)
+    plan = _plan_phase2(r, sides, band, buy_improve, buy_normal, sell_improve,
+                        sell_normal, trade_prices, add_qtys, trade_qtys,
+                        cancel_picks, next_order_id, ids, prices, qtys, n_active)
+    _apply_plan(*plan[:5], plan[5], plan[6])
 
 def phase3():
     target = 1000
-    count = 0
-    mid_start = 42000.0
-    mid_end = 42100.0
-    while count < target:
-        progress = count / target
-        mid = mid_start + (mid_end - mid_start) * progress
-        r = random.random()
-        if r < 0.55:
-            side = "BUY" if random.random() < 0.55 else "SELL"
-            if side == "BUY":
-                if random.random() < 0.35:
-                    price = round(random.uniform(mid, mid + 15.0) * 2) / 2
-                else:
-                    price = round(random.uniform(mid - 50.0, mid) * 2) / 2
-            else:
-                if random.random() < 0.25:
-                    price = round(random.uniform(mid - 10.0, mid) * 2) / 2
-                else:
-                    price = round(random.uniform(mid, mid + 50.0) * 2) / 2
-            price = max(41000.0, min(43000.0, price))
-            qty = random.randint(1, 50)
-            add_order(side, price, qty)
-            count += 1
-        elif r < 0.80:
-            if not active_orders:
-                continue
-            oid = random.choice(list(active_orders.keys()))
-            cancel_order(oid)
-            count += 1
-        else:
-            side = "BUY" if random.random() < 0.55 else "SELL"
-            price = round(random.uniform(mid - 2.0, mid + 2.0) * 2) / 2
-            price = max(41000.0, min(43000.0, price))
-            qty = random.randint(1, 30)
-            emit_trade(side, price, qty)
-            count += 1
+    _use_stream(3)
+    r = _uniforms(target)
+    sides = _uniforms(target)
+    band = _uniforms(target)
+    # Prices depend on the drifting mid, so draw raw offsets and shift
+    # them by the per-event mid inside the kernel.
+    buy_agg_off = _uniform_between(0.0, 15.0, target)
+    buy_pass_off = _uniform_between(-50.0, 0.0, target)
+    sell_agg_off = _uniform_between(-10.0, 0.0, target)
+    sell_pass_off = _uniform_between(0.0, 50.0, target)
+    trade_off = _uniform_between(-2.0, 2.0, target)
+    add_qtys = _integers(1, 51, target, np.int32)
+    trade_qtys = _integers(1, 31, target, np.int32)
+    cancel_picks = _uniforms(target)
+    ids, prices, qtys, n_active = _kernel_state(target)
+    plan = _plan_phase3(r, sides, band, buy_agg_off, buy_pass_off, sell_agg_off,
+                        sell_pass_off, trade_off, add_qtys, trade_qtys,
+                        cancel_picks, next_order_id, ids, prices, qtys, n_active)
+    _apply_plan(*plan[:5], plan[5], plan[6])
 
 def phase4():
     target = 1500
-    count = 0
     mid = 42050.0
-    while count < target:
-        r = random.random()
-        if r < 0.65:
-            side = "BUY" if random.random() < 0.5 else "SELL"
-            if side == "BUY":
-                price = round(random.uniform(mid - 50.0, mid) * 2) / 2
-                if random.random() < 0.08:
-                    price = round(random.uniform(mid, mid + 5.0) * 2) / 2
-            else:
-                price = round(random.uniform(mid + 0.5, mid + 50.0) * 2) / 2
-                if random.random() < 0.08:
-                    price = round(random.uniform(mid - 5.0, mid) * 2) / 2
-            price = max(41000.0, min(43000.0, price))
-            qty = random.randint(1, 20)
-            add_order(side, price, qty)
-            count += 1
-        elif r < 0.90:
-            if not active_orders:
-                continue
-            oid = random.choice(list(active_orders.keys()))
-            cancel_order(oid)
-            count += 1
-        else:
-            side = "BUY" if random.random() < 0.5 else "SELL"
-            price = round(random.uniform(mid - 1.0, mid + 1.0) * 2) / 2
-            price = max(41000.0, min(43000.0, price))
-            qty = random.randint(1, 10)
-            emit_trade(side, price, qty)
-            count += 1
+    _use_stream(4)
+    r = _uniforms(target)
+    sides = _integers(0, 2, target, np.uint8)
+    flip = _uniforms(target)
+    buy_prices = half_ticks(_uniform_between(mid - 50.0, mid, target))
+    buy_flip_prices = half_ticks(_uniform_between(mid, mid + 5.0, target))
+    sell_prices = half_ticks(_uniform_between(mid + 0.5, mid + 50.0, target))
+    sell_flip_prices = half_ticks(_uniform_between(mid - 5.0, mid, target))
+    trade_prices = half_ticks(_uniform_between(mid - 1.0, mid + 1.0, target))
+    add_qtys = _integers(1, 21, target, np.int32)
+    trade_qtys = _integers(1, 11, target, np.int32)
+    cancel_picks = _uniforms(target)
+    ids, prices, qtys, n_active = _kernel_state(target)
+    plan = _plan_phase4(r, sides, flip, buy_prices, buy_flip_prices,
+                        sell_prices, sell_flip_prices, trade_prices, add_qtys,
+                        trade_qtys, cancel_picks, next_order_id, ids, prices,
+                        qtys, n_active)
+    _apply_plan(*plan[:5], plan[5], plan[6])
 
 def main():
     print("Generating L3 data...")
+    if KERNEL_BACKEND != "numba":
+        print(f"  (planning kernel backend: {KERNEL_BACKEND})")
     phase1()
     print("  Phase 1: {} rows (active={}, buys={}, sells={})".format(
-        len(rows), len(active_orders), len(buy_orders), len(sell_orders)))
+        len(rows), len(active_oids), n_buy, n_sell))
     phase2()
     print("  Phase 2: {} rows (active={}, buys={}, sells={})".format(
-        len(rows), len(active_orders), len(buy_orders), len(sell_orders)))
+        len(rows), len(active_oids), n_buy, n_sell))
     phase3()
     print("  Phase 3: {} rows (active={}, buys={}, sells={})".format(
-        len(rows), len(active_orders), len(buy_orders), len(sell_orders)))
+        len(rows), len(active_oids), n_buy, n_sell))
     phase4()
     print("  Phase 4: {} rows (active={}, buys={}, sells={})".format(
-        len(rows), len(active_orders), len(buy_orders), len(sell_orders)))
+        len(rows), len(active_oids), n_buy, n_sell))
     total = len(rows)
     print("Total rows: {}".format(total))
     assert 4900 <= total <= 5100
-    fb = len(buy_orders)
-    fs = len(sell_orders)
+    fb = n_buy
+    fs = n_sell
     print("Final active -- BUY: {}, SELL: {}".format(fb, fs))
     assert fb > 0 and fs > 0
+    # Single validation pass: price range, cancel uniqueness, add/cancel
+    # cross-check, and event counters all maintained together.
+    na = nc = nt = 0
+    aids = set()
+    cids = set()
     for row in rows:
         p = float(row[4])
         assert 41000.0 <= p <= 43000.0
-    cids = set()
-    for row in rows:
-        if row[1] == "CANCEL":
-            assert row[2] not in cids
-            cids.add(row[2])
-    aids = set()
-    for row in rows:
-        if row[1] == "ADD":
+        event = row[1]
+        if event == "ADD":
+            na += 1
             aids.add(row[2])
-        elif row[1] == "CANCEL":
+        elif event == "CANCEL":
+            nc += 1
+            assert row[2] not in cids
             assert row[2] in aids
-    na = sum(1 for r in rows if r[1] == "ADD")
-    nc = sum(1 for r in rows if r[1] == "CANCEL")
-    nt = sum(1 for r in rows if r[1] == "TRADE")
+            cids.add(row[2])
+        else:
+            nt += 1
     print("Events -- ADD: {}, CANCEL: {}, TRADE: {}".format(na, nc, nt))
     with open(OUTPUT_PATH, "w", newline="") as f:
         w = csv.writer(f)
         w.writerow(["timestamp","event_type","order_id","side","price","quantity"])
-        for row in rows:
-            w.writerow(row)
+        w.writerows(rows)
     print("Wrote {} rows to {}".format(total, OUTPUT_PATH))
 
 if __name__ == "__main__":
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""Build the Cython fallback kernels for generate_l3_data.py.
+
+Only needed when Numba is not installed:
+
+    cd data && python setup_l3_core.py build_ext --inplace
+"""
+
+from Cython.Build import cythonize
+from setuptools import Extension, setup
+
+setup(
+    name="l3-core",
+    ext_modules=cythonize(
+        [Extension("_l3_core", ["_l3_core.pyx"],
+                   extra_compile_args=["-O3"])],
+        language_level=3,
+    ),
+)
@@ -8,14 +8,19 @@ Usage:
 
 import argparse
 import csv
+import io
 import json
+import multiprocessing
+import os
+import queue
 import sys
+import threading
 import time
 from pathlib import Path
 
 try:
     from influxdb_client import InfluxDBClient, Point, WritePrecision
-    from influxdb_client.client.write_api import SYNCHRONOUS
+    from influxdb_client.client.write_api import WriteOptions
 except ImportError:
     print("ERROR: influxdb-client not installed.")
     print("  pip install influxdb-client>=1.36.0")
@@ -30,21 +35,33 @@ DEFAULT_BUCKET = "analytics"
 
 def wait_for_influxdb(url, retries=30, delay=2):
     """Poll InfluxDB health endpoint until ready."""
-    import urllib.request
-    import urllib.error
-
-    health_url = f"{url}/health"
-    for i in range(retries):
-        try:
-            req = urllib.request.Request(health_url)
-            with urllib.request.urlopen(req, timeout=3) as resp:
+    import http.client
+    from urllib.parse import urlparse
+
+    parsed = urlparse(url)
+    host = parsed.hostname or "localhost"
+    port = parsed.port or (443 if parsed.scheme == "https" else 8086)
+    conn_cls = (http.client.HTTPSConnection if parsed.scheme == "https"
+                else http.client.HTTPConnection)
+
+    # One persistent connection for the whole poll loop instead of a
+    # fresh TCP handshake per retry; request() reconnects after close().
+    conn = conn_cls(host, port, timeout=3)
+    try:
+        for i in range(retries):
+            try:
+                conn.request("GET", "/health")
+                resp = conn.getresponse()
+                resp.read()  # Drain so the socket can be reused.
                 if resp.status == 200:
                     return True
-        except (urllib.error.URLError, ConnectionError, OSError):
-            pass
-        if i < retries - 1:
-            print(f"  Waiting for InfluxDB... ({i + 1}/{retries})")
-            time.sleep(delay)
+            except (http.client.HTTPException, ConnectionError, OSError):
+                conn.close()  # Stale or refused socket; reconnect next try.
+            if i < retries - 1:
+                print(f"  Waiting for InfluxDB... ({i + 1}/{retries})")
+                time.sleep(delay)
+    finally:
+        conn.close()
     return False
 
 
@@ -74,48 +91,125 @@ def drop_and_recreate_bucket(client, org, bucket_name):
     )
 
 
+FLOAT_FIELDS = [
+    "trade_price", "spread", "spread_bps", "microprice",
+    "imbalance", "tick_vol", "depth_imbalance",
+]
+INT_FIELDS = ["trade_quantity", "sequence_num"]
+
+
+def _chunk_ranges(csv_path, data_start, n_chunks):
+    """Split [data_start, EOF) into newline-aligned byte ranges."""
+    size = os.path.getsize(csv_path)
+    span = max(1, (size - data_start) // n_chunks)
+    offsets = [data_start]
+    with open(csv_path, "rb") as f:
+        for i in range(1, n_chunks):
+            pos = data_start + i * span
+            if pos >= size:
+                break
+            f.seek(pos)
+            f.readline()  # Advance to the start of the next full line.
+            aligned = f.tell()
+            if offsets[-1] < aligned < size:
+                offsets.append(aligned)
+    offsets.append(size)
+    return list(zip(offsets[:-1], offsets[1:]))
+
+
+def _parse_chunk(args):
+    """Parse one newline-aligned byte range into line-protocol records."""
+    csv_path, start, end, ts_idx, float_cols, int_cols, agg_idx = args
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode()
+
+    lines = []
+    for row in csv.reader(io.StringIO(text)):
+        # Timestamps are already nanosecond strings in the CSV; splice
+        # them into the line-protocol trailer as-is instead of
+        # round-tripping through int().
+        ts = row[ts_idx]
+        if not ts.isdigit():
+            raise ValueError(f"bad timestamp: {ts!r}")
+
+        # Build the line-protocol record directly; a Point would
+        # rebuild an internal dict across ~9 method calls per row.
+        fields = []
+        for name, i in float_cols:
+            val = row[i]
+            if val:
+                fields.append(f"{name}={float(val)}")
+
+        for name, i in int_cols:
+            val = row[i]
+            if val:
+                fields.append(f"{name}={int(val)}i")
+
+        aggressor = row[agg_idx] if agg_idx >= 0 else ""
+        if aggressor:
+            lines.append(f"trades,aggressor_side={aggressor} "
+                         f"{','.join(fields)} {ts}")
+        else:
+            lines.append(f"trades {','.join(fields)} {ts}")
+    return lines
+
+
 def ingest_csv(write_api, bucket, org, csv_path):
     """Ingest analytics CSV into the 'trades' measurement."""
     print(f"\nIngesting CSV: {csv_path}")
 
-    float_fields = [
-        "trade_price", "spread", "spread_bps", "microprice",
-        "imbalance", "tick_vol", "depth_imbalance",
-    ]
-    int_fields = ["trade_quantity", "sequence_num"]
+    with open(csv_path, "rb") as f:
+        header_line = f.readline()
+        data_start = f.tell()
+    header = next(csv.reader([header_line.decode()]), None)
+    if not header:
+        print("  Empty CSV, nothing to ingest.")
+        return 0
+
+    # Resolve column positions once; DictReader would rebuild a dict
+    # (hashing every header name) for each of the ~5k rows.
+    idx = {name: i for i, name in enumerate(header)}
+    ts_idx = idx["timestamp"]
+    float_cols = [(name, idx[name]) for name in FLOAT_FIELDS if name in idx]
+    int_cols = [(name, idx[name]) for name in INT_FIELDS if name in idx]
+    agg_idx = idx.get("aggressor_side", -1)
+
+    n_workers = os.cpu_count() or 1
+    tasks = [(csv_path, start, end, ts_idx, float_cols, int_cols, agg_idx)
+             for start, end in _chunk_ranges(csv_path, data_start, n_workers)]
+
+    # Worker processes parse byte-range chunks in parallel; the producer
+    # thread streams their results into line-protocol batches while the
+    # consumer posts them, so parsing overlaps the HTTP round-trips.
+    batch_queue = queue.Queue(maxsize=4)
+    producer_error = []
+
+    def produce():
+        try:
+            with multiprocessing.Pool(min(n_workers, len(tasks))) as pool:
+                for chunk_lines in pool.imap(_parse_chunk, tasks):
+                    for i in range(0, len(chunk_lines), 5000):
+                        batch_queue.put(chunk_lines[i:i + 5000])
+        except Exception as exc:  # Surface parse errors on the main thread.
+            producer_error.append(exc)
+        finally:
+            batch_queue.put(None)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
 
-    points = []
     row_count = 0
+    while True:
+        batch = batch_queue.get()
+        if batch is None:
+            break
+        write_api.write(bucket=bucket, org=org, record=batch)
+        row_count += len(batch)
+    producer.join()
 
-    with open(csv_path, "r") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            ts = int(row["timestamp"])
-            p = Point("trades").time(ts, WritePrecision.NS)
-
-            for field in float_fields:
-                val = row.get(field, "")
-                if val:
-                    p = p.field(field, float(val))
-
-            for field in int_fields:
-                val = row.get(field, "")
-                if val:
-                    p = p.field(field, int(val))
-
-            aggressor = row.get("aggressor_side", "")
-            if aggressor:
-                p = p.tag("aggressor_side", aggressor)
-
-            points.append(p)
-            row_count += 1
-
-            if len(points) >= 500:
-                write_api.write(bucket=bucket, org=org, record=points)
-                points = []
-
-    if points:
-        write_api.write(bucket=bucket, org=org, record=points)
+    if producer_error:
+        raise producer_error[0]
 
     print(f"  Wrote {row_count} trade points.")
     return row_count
@@ -171,8 +265,10 @@ def ingest_json(write_api, bucket, org, json_path):
     print("  Wrote 1 summary point.")
 
     # -- Depth profile measurement: one point per level per side --
+    # Emitted as raw line protocol; building a Point per level per side
+    # is 4-5 chained method calls of churn for a fixed-shape record.
     depth = data.get("depth_profile", {})
-    depth_points = []
+    depth_lines = []
 
     for side_key, side_tag in [("current_bid_depth", "bid"),
                                 ("current_ask_depth", "ask")]:
@@ -180,19 +276,23 @@ def ingest_json(write_api, bucket, org, json_path):
         avg_key = f"avg_{side_tag}_depth"
         avg_levels = depth.get(avg_key, [])
 
-        for i, qty in enumerate(levels):
-            dp = (Point("depth_profile")
-                  .time(summary_ts, WritePrecision.NS)
-                  .tag("side", side_tag)
-                  .tag("level", str(i))
-                  .field("current_quantity", float(qty)))
-            if i < len(avg_levels):
-                dp = dp.field("avg_quantity", float(avg_levels[i]))
-            depth_points.append(dp)
-
-    if depth_points:
-        write_api.write(bucket=bucket, org=org, record=depth_points)
-        print(f"  Wrote {len(depth_points)} depth profile points.")
+        # Pad the averages so the loop zips without a bounds check.
+        avgs = list(avg_levels[:len(levels)])
+        avgs += [None] * (len(levels) - len(avgs))
+        for i, (qty, avg) in enumerate(zip(levels, avgs)):
+            if avg is not None:
+                depth_lines.append(
+                    f"depth_profile,side={side_tag},level={i} "
+                    f"current_quantity={float(qty)},"
+                    f"avg_quantity={float(avg)} {summary_ts}")
+            else:
+                depth_lines.append(
+                    f"depth_profile,side={side_tag},level={i} "
+                    f"current_quantity={float(qty)} {summary_ts}")
+
+    if depth_lines:
+        write_api.write(bucket=bucket, org=org, record=depth_lines)
+        print(f"  Wrote {len(depth_lines)} depth profile points.")
 
 
 def main():
@@ -232,12 +332,22 @@ def main():
         print("  Start containers: docker compose -f grafana/docker-compose.yml up -d")
         sys.exit(1)
 
-    client = InfluxDBClient(url=args.url, token=args.token, org=args.org)
+    # Line protocol compresses ~6-10x; on a network-bound ingest fewer
+    # bytes on the wire translates directly into throughput.
+    client = InfluxDBClient(url=args.url, token=args.token, org=args.org,
+                            enable_gzip=True)
 
     if args.drop:
         drop_and_recreate_bucket(client, args.org, args.bucket)
 
-    write_api = client.write_api(write_options=SYNCHRONOUS)
+    # Batched asynchronous writes: large batches amortize the HTTP
+    # round-trip instead of blocking on every 500-point POST.
+    write_api = client.write_api(write_options=WriteOptions(
+        batch_size=5000,
+        flush_interval=1000,
+        jitter_interval=0,
+        retry_interval=5000,
+    ))
 
     total = 0
     if args.csv:
@@ -245,6 +355,7 @@ def main():
     if args.json:
         ingest_json(write_api, args.bucket, args.org, args.json)
 
+    write_api.close()  # Flush any buffered batches before disconnecting.
     client.close()
     print(f"\nDone. Ingested {total} trade points into '{args.bucket}'.")
     print("Open Grafana: http://localhost:3000")
@@ -125,6 +125,9 @@ void bind_analytics(py::module_& m) {
         .def("on_event", &AnalyticsEngine::on_event, py::arg("event"))
         .def("write_json", &AnalyticsEngine::write_json, py::arg("path"))
         .def("write_csv", &AnalyticsEngine::write_csv, py::arg("path"))
+        .def("write_outputs", &AnalyticsEngine::write_outputs,
+             py::arg("json_path"), py::arg("csv_path"),
+             "Write JSON summary and time-series CSV in one call")
         .def("print_summary", &AnalyticsEngine::print_summary)
         .def("to_dict", [](const AnalyticsEngine& engine) {
             return json_to_py(engine.to_json());
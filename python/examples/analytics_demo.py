@@ -77,8 +77,7 @@ def main():
 
     json_path = os.path.join(output_dir, "analytics_output.json")
     csv_path = os.path.join(output_dir, "analytics_timeseries.csv")
-    analytics.write_json(json_path)
-    analytics.write_csv(csv_path)
+    analytics.write_outputs(json_path, csv_path)
     print(f"\n  JSON written to: {json_path}")
     print(f"  CSV written to:  {csv_path}")
 
@@ -4,9 +4,58 @@
 #include <fstream>
 #include <iomanip>
 #include <iostream>
+#include <sstream>
 
 #include <nlohmann/json.hpp>
 
+#ifdef __linux__
+#include <fcntl.h>
+#include <unistd.h>
+#endif
+
+namespace {
+
+#ifdef __linux__
+/// Linux fast path: write an already-serialized payload straight to a raw
+/// fd in large chunks, skipping ofstream's internal buffering. The payload
+/// is one contiguous buffer, so a handful of big write() calls saturate
+/// the page cache with minimal syscall overhead.
+bool write_payload(const std::string& path, const std::string& body) {
+    int fd = ::open(path.c_str(), O_WRONLY | O_CREAT | O_TRUNC, 0644);
+    if (fd < 0) {
+        return false;
+    }
+    constexpr size_t kChunkBytes = 4u << 20;  // 4MB per submission
+    const char* data = body.data();
+    size_t remaining = body.size();
+    bool ok = true;
+    while (remaining > 0) {
+        size_t len = remaining < kChunkBytes ? remaining : kChunkBytes;
+        ssize_t written = ::write(fd, data, len);
+        if (written < 0) {
+            ok = false;
+            break;
+        }
+        data += written;
+        remaining -= static_cast<size_t>(written);
+    }
+    ::close(fd);
+    return ok;
+}
+#else
+/// Portable fallback: single buffered write through ofstream.
+bool write_payload(const std::string& path, const std::string& body) {
+    std::ofstream out(path, std::ios::binary);
+    if (!out.is_open()) {
+        return false;
+    }
+    out.write(body.data(), static_cast<std::streamsize>(body.size()));
+    return out.good();
+}
+#endif
+
+}  // namespace
+
 namespace hft {
 
 AnalyticsEngine::AnalyticsEngine(const OrderBook& book,
@@ -78,20 +127,13 @@ nlohmann::json AnalyticsEngine::to_json() const {
 }
 
 void AnalyticsEngine::write_json(const std::string& path) const {
-    std::ofstream out(path);
-    if (!out.is_open()) {
+    if (!write_payload(path, to_json().dump(2) + "\n")) {
         std::cerr << "Failed to write analytics JSON to: " << path << "\n";
-        return;
     }
-    out << to_json().dump(2) << "\n";
 }
 
-void AnalyticsEngine::write_csv(const std::string& path) const {
-    std::ofstream out(path);
-    if (!out.is_open()) {
-        std::cerr << "Failed to write analytics CSV to: " << path << "\n";
-        return;
-    }
+std::string AnalyticsEngine::csv_body() const {
+    std::ostringstream out;
 
     // Header
     out << "sequence_num,timestamp,trade_price,trade_quantity,spread,"
@@ -117,6 +159,28 @@ void AnalyticsEngine::write_csv(const std::string& path) const {
             << (row.aggressor_side == Side::Buy ? "BUY" : "SELL")
             << "\n";
     }
+    return out.str();
+}
+
+void AnalyticsEngine::write_csv(const std::string& path) const {
+    if (!write_payload(path, csv_body())) {
+        std::cerr << "Failed to write analytics CSV to: " << path << "\n";
+    }
+}
+
+void AnalyticsEngine::write_outputs(const std::string& json_path,
+                                    const std::string& csv_path) const {
+    // Serialize both payloads before touching the filesystem so each file
+    // is written in a single large call.
+    const std::string json_body = to_json().dump(2) + "\n";
+    const std::string csv = csv_body();
+
+    if (!write_payload(json_path, json_body)) {
+        std::cerr << "Failed to write analytics JSON to: " << json_path << "\n";
+    }
+    if (!write_payload(csv_path, csv)) {
+        std::cerr << "Failed to write analytics CSV to: " << csv_path << "\n";
+    }
 }
 
 void AnalyticsEngine::print_summary() const {
@@ -55,6 +55,12 @@ public:
     /// Write time-series CSV (one row per trade) to file.
     void write_csv(const std::string& path) const;
 
+    /// Write both the JSON summary and the time-series CSV in one call.
+    /// Serializes each payload fully in memory first, so file I/O is two
+    /// large writes instead of formatting interleaved with stream output.
+    void write_outputs(const std::string& json_path,
+                       const std::string& csv_path) const;
+
     /// Print human-readable summary to stdout.
     void print_summary() const;
 
@@ -75,6 +81,9 @@ private:
     /// Infer aggressor side using Lee-Ready tick test.
     [[nodiscard]] Side infer_aggressor(Price trade_price) const;
 
+    /// Serialize the full time-series CSV (header + rows) to a string.
+    [[nodiscard]] std::string csv_body() const;
+
     const OrderBook& book_;
     AnalyticsConfig config_;
 
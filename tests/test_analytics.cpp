@@ -832,6 +832,52 @@ TEST_F(AnalyticsEngineTest, JsonFileOutput) {
     std::remove(json_path.c_str());
 }
 
+TEST_F(AnalyticsEngineTest, WriteOutputs) {
+    place_buy(book, pool, 100, 150 * PRICE_SCALE, 100);
+    place_sell(book, pool, 200, 151 * PRICE_SCALE, 100);
+
+    AnalyticsEngine engine(book);
+
+    auto acc = make_accepted(1, 150 * PRICE_SCALE);
+    engine.on_event(acc);
+
+    for (int i = 0; i < 3; ++i) {
+        auto trade = make_trade(150 * PRICE_SCALE + TICK, 10, i + 1, 1000 + i);
+        engine.on_event(trade);
+    }
+
+    std::string json_path = "test_analytics_outputs.json";
+    std::string csv_path = "test_analytics_outputs.csv";
+    engine.write_outputs(json_path, csv_path);
+
+    // Verify JSON was written and is valid
+    std::ifstream json_file(json_path);
+    ASSERT_TRUE(json_file.is_open());
+    nlohmann::json parsed;
+    ASSERT_NO_THROW(parsed = nlohmann::json::parse(json_file));
+    EXPECT_TRUE(parsed.contains("spread"));
+    EXPECT_EQ(parsed["trade_count"], 3);
+
+    // Verify CSV matches the single-file writer's format
+    std::ifstream csv(csv_path);
+    ASSERT_TRUE(csv.is_open());
+    std::string header;
+    std::getline(csv, header);
+    EXPECT_NE(header.find("sequence_num"), std::string::npos);
+    int row_count = 0;
+    std::string line;
+    while (std::getline(csv, line)) {
+        if (!line.empty()) ++row_count;
+    }
+    EXPECT_EQ(row_count, 3);
+
+    // Cleanup
+    json_file.close();
+    csv.close();
+    std::remove(json_path.c_str());
+    std::remove(csv_path.c_str());
+}
+
 TEST_F(AnalyticsEngineTest, LeeReadyTickTest) {
     place_buy(book, pool, 100, 150 * PRICE_SCALE, 100);
     place_sell(book, pool, 200, 151 * PRICE_SCALE, 100);